@@ -1,10 +1,13 @@
 import json
 import re
 import sys
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterable, Optional, TypedDict
+from typing import Any, Iterable, Iterator, Optional, TypedDict
+
+from json_io import atomic_write, json_dumps, json_loads
 
 
 # ----------------------------
@@ -13,7 +16,6 @@ from typing import Any, Iterable, Optional, TypedDict
 
 PATH_IN: Path = Path("data/processed/match_round_events.json")
 PATH_OUT: Path = Path("data/processed/match_round_events_extended.json")
-JSON_INDENT: int = 2
 
 
 # ----------------------------
@@ -25,20 +27,20 @@ PLAYER_BLOB_RE = re.compile(r"^.+?<\d+><[^>]+><[^>]+>$")
 
 KILL_RE = re.compile(
     r"""
-    ^.*?:\s*'(?P<killer>[^']+)'\s+.*?
-    killed\s+'(?P<victim>[^']+)'
-    .*?\swith\s+'(?P<weapon>[^']+)'
+    ^.*?:\s*"(?P<killer>[^"]+)"\s+.*?
+    killed\s+"(?P<victim>[^"]+)"
+    .*?\swith\s+"(?P<weapon>[^"]+)"
     """,
     re.IGNORECASE | re.VERBOSE,
 )
 
 TEAM_SCORED_RE = re.compile(
-    r"Team\s+'(?P<side>CT|TERRORIST)'\s+scored\s+'(?P<score>\d+)'",
+    r'Team\s+"(?P<side>CT|TERRORIST)"\s+scored\s+"(?P<score>\d+)"',
     re.IGNORECASE,
 )
 
 MATCHSTATUS_TEAM_RE = re.compile(
-    r"MatchStatus:\s*Team\s+playing\s+'(?P<side>CT|TERRORIST)'\s*:\s*(?P<team>.+?)\s*$",
+    r'MatchStatus:\s*Team\s+playing\s+"(?P<side>CT|TERRORIST)"\s*:\s*(?P<team>.+?)\s*$',
     re.IGNORECASE,
 )
 
@@ -86,7 +88,10 @@ def parse_timestamp(line: str) -> Optional[datetime]:
     m = TS_RE.match(line)
     if not m:
         return None
-    return datetime.strptime(f"{m.group(1)} {m.group(2)}", "%m/%d/%Y %H:%M:%S")
+    # strptime re-parses the format string on every call; the regex already split the fields
+    month, day, year = m.group(1).split("/")
+    hour, minute, second = m.group(2).split(":")
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
 
 
 def time_only(dt: datetime) -> str:
@@ -116,13 +121,6 @@ class RoundTimes:
         return mmss_from_seconds(self.length_seconds)
 
 
-def infer_round_times(lines: Iterable[str]) -> Optional[RoundTimes]:
-    dts = [dt for dt in (parse_timestamp(l) for l in lines) if dt is not None]
-    if not dts:
-        return None
-    return RoundTimes(start=min(dts), end=max(dts))
-
-
 # ----------------------------
 # Kill extraction
 # ----------------------------
@@ -131,9 +129,10 @@ def player_name(identity_blob: str) -> str:
     return identity_blob.split("<", 1)[0].strip()
 
 
-def extract_kill_event(line: str) -> Optional[KillEvent]:
+def extract_kill_event(line: str, ts: Optional[datetime] = None) -> Optional[KillEvent]:
     lower = line.lower()
-    if "killed other" in lower:
+    # plain substring checks first: most lines never reach the regex engine
+    if "killed" not in lower or "killed other" in lower:
         return None
 
     m = KILL_RE.search(line)
@@ -149,7 +148,8 @@ def extract_kill_event(line: str) -> Optional[KillEvent]:
         return None
 
     weapon = m.group("weapon").strip().lower()
-    ts = parse_timestamp(line)
+    if ts is None:
+        ts = parse_timestamp(line)
     t = time_only(ts) if ts else None
 
     return {
@@ -162,15 +162,17 @@ def extract_kill_event(line: str) -> Optional[KillEvent]:
 
 
 def compute_round_mvp(kill_events: list[KillEvent]) -> tuple[Optional[str], int]:
+    # Not Counter.most_common: ties go to whoever reached the top count first
     counts: dict[str, int] = {}
     best_player: Optional[str] = None
     best_kills = 0
 
     for ev in kill_events:
         killer = ev["killed_by"]
-        counts[killer] = counts.get(killer, 0) + 1
-        if counts[killer] > best_kills:
-            best_kills = counts[killer]
+        n = counts.get(killer, 0) + 1
+        counts[killer] = n
+        if n > best_kills:
+            best_kills = n
             best_player = killer
 
     return best_player, best_kills
@@ -180,28 +182,7 @@ def compute_round_mvp(kill_events: list[KillEvent]) -> tuple[Optional[str], int]
 # Winner extraction
 # ----------------------------
 
-def extract_scores(lines: Iterable[str]) -> dict[str, int]:
-    scores: dict[str, int] = {}
-    for line in lines:
-        m = TEAM_SCORED_RE.search(line)
-        if m:
-            scores[m.group("side").upper()] = int(m.group("score"))
-    return scores
-
-
-def extract_team_map(lines: Iterable[str]) -> dict[str, str]:
-    teams: dict[str, str] = {}
-    for line in lines:
-        m = MATCHSTATUS_TEAM_RE.search(line)
-        if m:
-            teams[m.group("side").upper()] = m.group("team").strip()
-    return teams
-
-
-def extract_winner(lines: Iterable[str]) -> tuple[Optional[str], Optional[str]]:
-    scores = extract_scores(lines)
-    teams = extract_team_map(lines)
-
+def resolve_winner(scores: dict[str, int], teams: dict[str, str]) -> tuple[Optional[str], Optional[str]]:
     ct = scores.get("CT")
     t = scores.get("TERRORIST")
     if ct is None or t is None or ct == t:
@@ -216,17 +197,43 @@ def extract_winner(lines: Iterable[str]) -> tuple[Optional[str], Optional[str]]:
 # ----------------------------
 
 def build_round_summary(lines: list[str]) -> RoundSummary:
-    times = infer_round_times(lines)
-
+    """
+    Single pass over the round: timestamps, kills, scores and team names are
+    all picked up per line so each line is parsed only once.
+    """
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
     kill_events: list[KillEvent] = []
+    scores: dict[str, int] = {}
+    teams: dict[str, str] = {}
+
     for line in lines:
-        ev = extract_kill_event(line)
+        ts = parse_timestamp(line)
+        if ts is not None:
+            if start is None or ts < start:
+                start = ts
+            if end is None or ts > end:
+                end = ts
+
+        ev = extract_kill_event(line, ts)
         if ev:
             kill_events.append(ev)
+            continue
+
+        m = TEAM_SCORED_RE.search(line)
+        if m:
+            scores[m.group("side").upper()] = int(m.group("score"))
+            continue
+
+        m = MATCHSTATUS_TEAM_RE.search(line)
+        if m:
+            teams[m.group("side").upper()] = m.group("team").strip()
+
+    times = RoundTimes(start=start, end=end) if start is not None and end is not None else None
 
     total_kills = len(kill_events)
     mvp_player, mvp_kills = compute_round_mvp(kill_events) if kill_events else (None, 0)
-    winning_side, winning_team = extract_winner(lines)
+    winning_side, winning_team = resolve_winner(scores, teams)
 
     if times is None:
         return {
@@ -288,38 +295,28 @@ def build_match_overview(rounds: dict[str, RoundSummary]) -> MatchOverview:
         overview["shortest_round"] = {"round": r_short, "length": mmss_from_seconds(s_short), "length_seconds": s_short}
         overview["longest_round"] = {"round": r_long, "length": mmss_from_seconds(s_long), "length_seconds": s_long}
 
-    kills_by_player: dict[str, int] = {}
-    deaths_by_player: dict[str, int] = {}
-    kills_by_weapon: dict[str, int] = {}
-    headshots_by_player: dict[str, int] = {}
-
-    for rs in rounds.values():
-        for ev in rs["kill_events"]:
-            killer = ev["killed_by"]
-            victim = ev["killed"]
-            weapon = ev["weapon"]
-
-            kills_by_player[killer] = kills_by_player.get(killer, 0) + 1
-            deaths_by_player[victim] = deaths_by_player.get(victim, 0) + 1
-            kills_by_weapon[weapon] = kills_by_weapon.get(weapon, 0) + 1
+    kill_events = [ev for rs in rounds.values() for ev in rs["kill_events"]]
 
-            if ev["is_headshot"]:
-                headshots_by_player[killer] = headshots_by_player.get(killer, 0) + 1
+    # Counter tallies in C; most_common(1) keeps max()'s first-seen tie-break
+    kills_by_player = Counter(ev["killed_by"] for ev in kill_events)
+    deaths_by_player = Counter(ev["killed"] for ev in kill_events)
+    kills_by_weapon = Counter(ev["weapon"] for ev in kill_events)
+    headshots_by_player = Counter(ev["killed_by"] for ev in kill_events if ev["is_headshot"])
 
     if kills_by_player:
-        p, k = max(kills_by_player.items(), key=lambda kv: kv[1])
+        [(p, k)] = kills_by_player.most_common(1)
         overview["mvp_kills"] = {"player": p, "kills": k}
 
     if deaths_by_player:
-        p, d = max(deaths_by_player.items(), key=lambda kv: kv[1])
+        [(p, d)] = deaths_by_player.most_common(1)
         overview["lsp_deaths"] = {"player": p, "deaths": d}
 
     if kills_by_weapon:
-        w, k = max(kills_by_weapon.items(), key=lambda kv: kv[1])
+        [(w, k)] = kills_by_weapon.most_common(1)
         overview["top_weapon"] = {"weapon": w, "kills": k}
 
     if headshots_by_player:
-        p, h = max(headshots_by_player.items(), key=lambda kv: kv[1])
+        [(p, h)] = headshots_by_player.most_common(1)
         overview["most_headshots"] = {"player": p, "headshots": h}
 
     return overview
@@ -329,41 +326,50 @@ def build_match_overview(rounds: dict[str, RoundSummary]) -> MatchOverview:
 # Transformation + I/O
 # ----------------------------
 
-def transform(input_data: dict[str, Any]) -> dict[str, Any]:
+def transform(input_data: dict[str, Any]) -> Iterator[tuple[str, RoundSummary]]:
     """
-    Output format:
-    {
-      "rounds": { "round_1": {...}, ... },
-      "match_overview": {...}
-    }
+    Lazily yield (round_key, RoundSummary) pairs; see write_extended_json for the output format.
 
+    Input is validated up front so a bad round fails before anything is written.
     Note: We intentionally drop round_count / total_event_lines (and anything else top-level).
     """
     rounds_in = input_data.get("rounds")
     if not isinstance(rounds_in, dict):
         raise ValueError("Input JSON must contain a 'rounds' object mapping round keys to lists of event lines.")
 
-    rounds_out: dict[str, RoundSummary] = {}
     for round_key, lines in rounds_in.items():
         if not isinstance(lines, list) or not all(isinstance(x, str) for x in lines):
             raise ValueError(f"Round '{round_key}' must be a list of strings.")
-        rounds_out[round_key] = build_round_summary(lines)
 
-    return {
-        "rounds": rounds_out,
-        "match_overview": build_match_overview(rounds_out),
-    }
+    return ((round_key, build_round_summary(lines)) for round_key, lines in rounds_in.items())
 
 
-def write_json_safely(path: Path, payload: dict[str, Any]) -> None:
+def write_extended_json(path: Path, rounds: Iterable[tuple[str, RoundSummary]]) -> dict[str, Any]:
     """
-    Write JSON to disk with a clear error if it fails.
+    Stream rounds to disk one at a time, then append the overview.
+    Output format (same bytes as dumping the whole dict with indent=2):
+    {
+      "rounds": { "round_1": {...}, ... },
+      "match_overview": {...}
+    }
+    Returns the payload for reporting; summaries are kept because the overview needs them.
+    The previous file is only replaced once the whole payload has been written.
     """
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=JSON_INDENT),
-        encoding="utf-8",
-    )
+    rounds_out: dict[str, RoundSummary] = {}
+
+    with atomic_write(path) as f:
+        f.write(b'{\n  "rounds": {')
+        for round_key, summary in rounds:
+            if rounds_out:
+                f.write(b",")
+            f.write(b"\n    " + json_dumps(round_key) + b": " + json_dumps(summary).replace(b"\n", b"\n    "))
+            rounds_out[round_key] = summary
+        f.write(b"\n  }," if rounds_out else b"},")
+
+        overview = build_match_overview(rounds_out)
+        f.write(b'\n  "match_overview": ' + json_dumps(overview).replace(b"\n", b"\n  ") + b"\n}")
+
+    return {"rounds": rounds_out, "match_overview": overview}
 
 
 def run() -> int:
@@ -375,11 +381,10 @@ def run() -> int:
             print(f"[ERROR] Input JSON not found: {PATH_IN}")
             return 1
 
-        raw = PATH_IN.read_text(encoding="utf-8")
-        data: dict[str, Any] = json.loads(raw)
+        raw = PATH_IN.read_bytes()
+        data: dict[str, Any] = json_loads(raw)
 
-        extended = transform(data)
-        write_json_safely(PATH_OUT, extended)
+        extended = write_extended_json(PATH_OUT, transform(data))
 
         rounds_count = len(extended.get("rounds", {}))
         print(f"[OK] JSON created: {PATH_OUT}")
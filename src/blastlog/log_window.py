@@ -0,0 +1,66 @@
+"""
+Timestamp keys for raw server log lines, and locating a time window in the log.
+"""
+import mmap
+import os
+from datetime import datetime
+from typing import BinaryIO, Callable, Optional
+
+LineKey = Callable[[str], Optional[int]]
+
+
+def dt_key(dt: datetime) -> int:
+    # YYYYMMDDHHMMSS as an int: orders like the datetime, compares much cheaper
+    return dt.year * 10**10 + dt.month * 10**8 + dt.day * 10**6 + dt.hour * 10**4 + dt.minute * 100 + dt.second
+
+
+def ts_prefix_key(text: str) -> Optional[int]:
+    """Key of a leading fixed-width "MM/DD/YYYY - HH:MM:SS", sliced instead of strptime'd; None if absent."""
+    if text[2:3] != "/" or text[5:6] != "/" or text[10:13] != " - " or text[15:16] != ":" or text[18:19] != ":":
+        return None
+    try:
+        return (
+            int(text[6:10]) * 10**10 + int(text[0:2]) * 10**8 + int(text[3:5]) * 10**6
+            + int(text[13:15]) * 10**4 + int(text[16:18]) * 100 + int(text[19:21])
+        )
+    except ValueError:
+        return None
+
+
+def window_start_offset(f: BinaryIO, start_key: int, line_key: LineKey) -> int:
+    """
+    Byte offset of the first line whose key is >= start_key.
+    Server logs are written in time order, so this is a binary search over the file.
+    line_key maps a line (or its first 64 chars) to a timestamp key, or None to skip it.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return 0
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        def line_start(pos: int) -> int:
+            if pos == 0 or mm[pos - 1] == ord("\n"):
+                return pos
+            nl = mm.find(b"\n", pos)
+            return size if nl < 0 else nl + 1
+
+        def first_key_from(pos: int) -> Optional[int]:
+            pos = line_start(pos)
+            while pos < size:
+                nl = mm.find(b"\n", pos)
+                end = size if nl < 0 else nl
+                key = line_key(mm[pos:min(end, pos + 64)].decode("utf-8", errors="replace"))
+                if key is not None:
+                    return key
+                pos = end + 1
+            return None
+
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = first_key_from(mid)
+            if key is None or key >= start_key:
+                hi = mid
+            else:
+                lo = mid + 1
+        return line_start(lo)
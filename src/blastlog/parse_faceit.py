@@ -1,16 +1,21 @@
 import json
+import mmap
+import os
 import re
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Union
 
+from json_io import json_dumps
+
 
 # ----------------------------
 # Regex
 # ----------------------------
 
-FACEIT_ANY_RE = re.compile(r"FACEIT\^*", re.IGNORECASE)
+# Literal tag the FACEIT plugin prefixes its messages with ("[FACEIT]", "[FACEIT^]")
+FACEIT_TAG = "FACEIT"
 
 # Timestamp prefix: 11/28/2021 - 20:26:21:
 LOG_TS_RE = re.compile(
@@ -21,15 +26,13 @@ LOG_TS_RE = re.compile(
 FACEIT_MAP = re.compile(r"\bBlocked map\s+(?P<map>de_[a-z0-9_]+)\b", re.IGNORECASE)
 FACEIT_MATCH_START = re.compile(r"\bAdmin\b.*\bstarted the match\b", re.IGNORECASE)
 
-# Winner line: "... Team <name> won."
-FACEIT_WIN_LINE = re.compile(r"\bTeam\b.*\bwon\b", re.IGNORECASE)
+# Winner line: "... Team <name> won." (a match both identifies the line and captures the team)
 FACEIT_WINNER = re.compile(
     r"\bTeam\s+(?P<team>\"[^\"]+\"|'[^']+'|.+?)\s+won\b",
     re.IGNORECASE,
 )
 
 # Score markers like [0 - 1], [16 - 6], etc.
-FACEIT_SCORE_ANY = re.compile(r"\[\s*\d+\s*-\s*\d+\s*\]")
 FACEIT_SCORE_VALUE = re.compile(r"\[\s*(?P<a>\d+)\s*-\s*(?P<b>\d+)\s*\]")
 
 FACEIT_SCORE_MARKER = re.compile(r"\[\s*0\s*-\s*1\s*\]")
@@ -40,9 +43,9 @@ FACEIT_TEAMS_FROM_SCORE = re.compile(
     re.IGNORECASE,
 )
 
-# Extract rounds played from MatchStatus lines:
+# Rounds played from MatchStatus lines:
 # Example fragment: "MatchStatus: Score: 6:16 ... RoundsPlayed: 22 ..."
-ROUNDS_PLAYED_RE = re.compile(r"\bRoundsPlayed:\s*(?P<rounds>\d+)\b", re.IGNORECASE)
+ROUNDS_PLAYED_MARKER = "RoundsPlayed:"
 
 
 # Types for JSON-friendly output
@@ -64,16 +67,58 @@ class ParsedLog:
 # helpers
 # ----------------------------
 
-def extract_faceit_lines(log_path: Union[str, Path]) -> List[str]:
+def rounds_played_from_line(line: str) -> Optional[int]:
+    """
+      RoundsPlayed: <n>   (pre-match "-1" values are ignored)
+    """
+    _, marker, rest = line.partition(ROUNDS_PLAYED_MARKER)
+    if not marker:
+        return None
+    token = rest.split(None, 1)[0] if rest.strip() else ""
+    return int(token) if token.isascii() and token.isdigit() else None
+
+
+def _line_bounds(mm: mmap.mmap, pos: int) -> Tuple[int, int]:
+    """[start, end) of the line containing byte offset pos, excluding the newline."""
+    start = mm.rfind(b"\n", 0, pos) + 1
+    end = mm.find(b"\n", pos)
+    return start, (len(mm) if end < 0 else end)
+
+
+def _decode_line(raw: bytes) -> str:
+    return raw.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def scan_log(log_path: Union[str, Path]) -> Tuple[List[str], Optional[int]]:
+    """
+    Collect FACEIT lines and the last RoundsPlayed value from the raw log.
+    The file is memory-mapped and searched with bytes.find, so only matching lines are decoded.
+    """
     path = Path(log_path)
     faceit_lines: List[str] = []
+    rounds: Optional[int] = None
+
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return faceit_lines, rounds
 
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if FACEIT_ANY_RE.search(line):
-                faceit_lines.append(line.rstrip("\n"))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tag = FACEIT_TAG.encode()
+            pos = mm.find(tag)
+            while pos >= 0:
+                start, end = _line_bounds(mm, pos)
+                faceit_lines.append(_decode_line(mm[start:end]))
+                pos = mm.find(tag, end)
 
-    return faceit_lines
+            # only the final status matters: search backwards for the last valid value
+            marker = ROUNDS_PLAYED_MARKER.encode()
+            pos = mm.rfind(marker)
+            while pos >= 0 and rounds is None:
+                start, end = _line_bounds(mm, pos)
+                rounds = rounds_played_from_line(_decode_line(mm[start:end]))
+                pos = mm.rfind(marker, 0, start)
+
+    return faceit_lines, rounds
 
 
 def extract_dt_parts(line: str) -> Optional[Tuple[str, str]]:
@@ -87,17 +132,40 @@ def strip_prefix_timestamp(line: str) -> str:
     return LOG_TS_RE.sub("", line).strip()
 
 
+# control chars -> deleted, for str.translate
+_CTRL_TABLE = dict.fromkeys([*range(0x20), 0x7F])
+
+
+def strip_faceit_tags(s: str) -> str:
+    """Remove "[FACEIT]" / "[ FACEIT^ ]" style tags (any case) without a regex."""
+    i = s.find("[")
+    while i >= 0:
+        j = s.find("]", i + 1)
+        if j < 0:
+            break
+        inner = s[i + 1:j].strip()
+        if inner[:6].upper() == "FACEIT" and not inner[6:].strip("^"):
+            s = s[:i] + s[j + 1:]
+            i = s.find("[", i)
+        else:
+            i = s.find("[", i + 1)
+    return s
+
+
 def clean_team_name(raw: str) -> str:
     s = raw.strip()
-    s = re.sub(r"[\x00-\x1F\x7F]", "", s)  # control chars
-    s = re.sub(r"\[\s*FACEIT\^*\s*\]", "", s, flags=re.IGNORECASE)  # FACEIT tags
+    s = s.translate(_CTRL_TABLE)  # control chars
+    s = strip_faceit_tags(s)  # FACEIT tags
 
     if (s.startswith('"') and s.endswith('"')) or (s.startswith("'") and s.endswith("'")):
         s = s[1:-1].strip()
 
-    s = re.sub(r"^\s*Team\s+", "", s, flags=re.IGNORECASE).strip()
+    s = s.lstrip()
+    if s[:4].lower() == "team" and s[4:5].isspace():
+        s = s[4:]
+    s = s.strip()
     s = s.strip(" \t\r\n|:-.!,")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = " ".join(s.split())
     return s
 
 
@@ -146,21 +214,6 @@ def calculate_match_length_pretty(start_dt: Optional[str], end_dt: Optional[str]
     return f"{h:02d}:{m:02d}:{s:02d}"
 
 
-def calculate_total_rounds(log_path: Union[str, Path]) -> Optional[int]:
-    """
-      RoundsPlayed: <n>
-    """
-    path = Path(log_path)
-    rounds: Optional[int] = None
-
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            m = ROUNDS_PLAYED_RE.search(line)
-            if m:
-                rounds = int(m.group("rounds"))  # keep the last seen value (final status)
-    return rounds
-
-
 # ----------------------------
 # extraction
 # ----------------------------
@@ -179,13 +232,17 @@ def extract_faceit_match_key_events(
     winning_team: Optional[str] = None
     final_score: Optional[str] = None
 
+    # Forward pass: fields taken from their first occurrence (usually near the top).
     for line in faceit_lines:
-        if map_name is None:
+        # cheap literal checks gate the regexes; lowered once since they are case-insensitive
+        lower = line.lower()
+
+        if map_name is None and "blocked map" in lower:
             m_map = FACEIT_MAP.search(line)
             if m_map:
                 map_name = m_map.group("map").lower()
 
-        if start_dt is None and FACEIT_MATCH_START.search(line):
+        if start_dt is None and "started the match" in lower and FACEIT_MATCH_START.search(line):
             parts = extract_dt_parts(line)
             if parts:
                 d, t = parts
@@ -197,21 +254,36 @@ def extract_faceit_match_key_events(
             if teams:
                 team_1, team_2 = teams
 
-        if FACEIT_WIN_LINE.search(line):
+        # a winner line seen before the start still dates the match
+        if match_date is None and "won" in lower and FACEIT_WINNER.search(line):
             parts = extract_dt_parts(line)
             if parts:
-                d, t = parts
-                end_dt = f"{d} - {t}"
-                match_date = match_date or d
+                match_date = parts[0]
+
+        if map_name is not None and start_dt is not None and team_1 is not None:
+            break
 
+    # Reverse pass: fields taken from their last occurrence (at the end of the match).
+    for line in reversed(faceit_lines):
+        lower = line.lower()
+
+        if (end_dt is None or winning_team is None) and "won" in lower:
             m_win = FACEIT_WINNER.search(line)
             if m_win:
-                winning_team = clean_team_name(m_win.group("team"))
+                if end_dt is None:
+                    parts = extract_dt_parts(line)
+                    if parts:
+                        d, t = parts
+                        end_dt = f"{d} - {t}"
+
+                if winning_team is None:
+                    winning_team = clean_team_name(m_win.group("team"))
 
-        if FACEIT_SCORE_ANY.search(line):
-            score = extract_score_from_line(line)
-            if score:
-                final_score = score
+        if final_score is None:
+            final_score = extract_score_from_line(line)
+
+        if end_dt is not None and winning_team is not None and final_score is not None:
+            break
 
     match_length = calculate_match_length_pretty(start_dt, end_dt)
 
@@ -230,9 +302,7 @@ def extract_faceit_match_key_events(
 
 
 def parse_log(log_path: Union[str, Path]) -> ParsedLog:
-    faceit_lines = extract_faceit_lines(log_path)
-
-    total_rounds = calculate_total_rounds(log_path)
+    faceit_lines, total_rounds = scan_log(log_path)
 
     faceit_key_events = extract_faceit_match_key_events(
         faceit_lines=faceit_lines,
@@ -245,8 +315,7 @@ def dump_json(data: Dict[str, JSONValue], out_path: Union[str, Path]) -> Path:
     path = Path(out_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    path.write_bytes(json_dumps(data))
 
     return path
 
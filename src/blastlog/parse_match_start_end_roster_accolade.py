@@ -1,10 +1,16 @@
-import json
+import io
 import re
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable, Mapping, Optional
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence
+
+from json_io import json_dumps, json_loads
+from log_window import dt_key, ts_prefix_key, window_start_offset
 
 # -----------------------
 # Paths 
@@ -33,6 +39,7 @@ class MatchData:
     start_ts: str
     end_ts: str
     events: list[str]
+    ts_keys: array  # array("q"): timestamp key of each event line, in log (time) order
 
 
 # -----------------------
@@ -42,17 +49,14 @@ LINE_TS_RE = re.compile(
     r'^(?P<ts>\d{1,2}/\d{1,2}/\d{4}\s*-\s*\d{2}:\d{2}:\d{2}):\s*'
 )
 
-TEAM_NAME_RE = re.compile(
-    r'MatchStatus:\s*Team playing\s*"(?P<side>CT|TERRORIST)"\s*:\s*(?P<name>.+?)\s*$'
-)
+# MatchStatus: Team playing "CT": <name>
+TEAM_PLAYING_MARKER = 'MatchStatus: Team playing "'
 
 # "player<id><steam><CT>" dropped "m4a1"
-PLAYER_SIDE_RE = re.compile(
-    r'^.*:\s*"(?P<player>[^"<]+?)<\d+><[^>]*><(?P<side>CT|TERRORIST)>"\s+'
-    r'(?:dropped|picked up)\s+".+?"\s*$'
-)
+PLAYER_ACTION_MARKERS = ('>" dropped "', '>" picked up "')
+SIDE_VALUES = frozenset(side.value for side in Side)
 
-ACCOLADE_MARKER_RE = re.compile(r"\bACCOLADE\b", re.IGNORECASE)
+ACCOLADE_MARKER_RE = re.compile(r"\bACCOLADE\b")
 TAB_RE = re.compile(r"\t+")
 MULTISPACE_RE = re.compile(r" +")
 
@@ -70,66 +74,142 @@ def extract_line_ts(line: str) -> Optional[str]:
     return m.group("ts") if m else None
 
 
+@lru_cache(maxsize=4096)
+def ts_key(ts: str) -> int:
+    """
+    Timestamp string -> comparable YYYYMMDDHHMMSS int.
+    Zero-padded timestamps are sliced directly; anything else goes through strptime.
+    """
+    key = ts_prefix_key(ts) if len(ts) == 21 else None
+    return key if key is not None else dt_key(parse_ts(ts))
+
+
+def line_ts_key(line: str) -> Optional[int]:
+    """Timestamp key of a log line, or None if it has no timestamp prefix."""
+    if line[21:22] == ":" and line[2:3] == "/":
+        try:
+            return ts_key(line[:21])
+        except ValueError:
+            pass
+    ts = extract_line_ts(line)
+    return ts_key(ts) if ts is not None else None
+
+
+def match_team_name(line: str) -> Optional[tuple[Side, str]]:
+    """'MatchStatus: Team playing "CT": <name>' -> (side, name), by slicing instead of regex."""
+    idx = line.find(TEAM_PLAYING_MARKER)
+    if idx < 0:
+        return None
+
+    side, quote, rest = line[idx + len(TEAM_PLAYING_MARKER):].partition('"')
+    if not quote or side not in SIDE_VALUES:
+        return None
+
+    rest = rest.lstrip()
+    if not rest.startswith(":") or len(rest) < 2:
+        return None
+    return Side(side), rest[1:].strip()
+
+
+def match_player_side(line: str) -> Optional[tuple[str, Side]]:
+    """
+    '...: "player<id><steam><CT>" dropped|picked up "item"' -> (player, side).
+    Walks back from the action marker through the <..> fields with rfind/slicing.
+    """
+    for marker in PLAYER_ACTION_MARKERS:
+        end = line.rfind(marker)
+        if end >= 0:
+            break
+    else:
+        return None
+
+    item = line[end + len(marker):].rstrip()
+    if len(item) < 2 or not item.endswith('"'):
+        return None
+
+    side_start = line.rfind("<", 0, end)
+    side = line[side_start + 1:end]
+    if side not in SIDE_VALUES or line[side_start - 1:side_start] != ">":
+        return None
+
+    # steam id may be anything but ">", so find its start from the uid's closing ">"
+    uid_end = line.rfind(">", 0, side_start - 1)
+    uid_start = line.rfind("<", 0, uid_end)
+    if line[uid_end + 1:uid_end + 2] != "<" or not line[uid_start + 1:uid_end].isdigit():
+        return None
+
+    quote = line.rfind('"', 0, uid_start)
+    player = line[quote + 1:uid_start]
+    if quote < 0 or not player or "<" in player or not line[:quote].rstrip().endswith(":"):
+        return None
+
+    return player, Side(side)
+
+
 def load_frame(path: Path) -> tuple[str, str]:
     """Load start/end timestamps from JSON frame file."""
-    frame: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    frame: dict[str, Any] = json_loads(path.read_bytes())
     return str(frame["start_dt"]), str(frame["end_dt"])
 
 
 # -----------------------
 # Core extraction
 # -----------------------
-def iter_lines_in_range(path: Path, start_ts: str, end_ts: str) -> Iterable[str]:
+def iter_lines_in_range(path: Path, start_ts: str, end_ts: str) -> Iterator[tuple[int, str]]:
     """
-    Yield all lines in [start_ts, end_ts] inclusive.
-    We parse timestamps per-line and filter.
+    Yield (ts_key, line) for all lines in [start_ts, end_ts] inclusive.
+    We bisect to the start of the window and stop at the first line past end_ts.
     """
-    start_dt: datetime = parse_ts(start_ts)
-    end_dt: datetime = parse_ts(end_ts)
-
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for raw in f:
-            line: str = raw.rstrip("\n")
-            ts: Optional[str] = extract_line_ts(line)
-            if ts is None:
-                continue
-
-            dt: datetime = parse_ts(ts)
-            if start_dt <= dt <= end_dt:
-                yield line
-
-
-def extract_events_in_range(path: Path, start_ts: str, end_ts: str) -> list[str]:
-    return list(iter_lines_in_range(path, start_ts, end_ts))
+    start_key: int = ts_key(start_ts)
+    end_key: int = ts_key(end_ts)
+
+    with path.open("rb") as raw_f:
+        raw_f.seek(window_start_offset(raw_f, start_key, line_ts_key))
+        with io.TextIOWrapper(raw_f, encoding="utf-8", errors="replace") as f:
+            for raw in f:
+                line: str = raw.rstrip("\n")
+                key: Optional[int] = line_ts_key(line)
+                if key is None:
+                    continue
+                if key > end_key:
+                    break
+                if key >= start_key:
+                    yield key, line
+
+
+def extract_events_in_range(path: Path, start_ts: str, end_ts: str) -> tuple[list[str], array]:
+    """
+    Event lines plus their timestamp keys, parsed once here so later passes
+    can bisect on the keys instead of re-parsing every line.
+    """
+    events: list[str] = []
+    ts_keys: array = array("q")
+    for key, line in iter_lines_in_range(path, start_ts, end_ts):
+        ts_keys.append(key)
+        events.append(line)
+    return events, ts_keys
 
 
 # -----------------------
 # Match 
 # -----------------------
-def team_names_at_ts(events: list[str], target_ts: str) -> TeamMap:
+def team_names_at_ts(events: list[str], ts_keys: Sequence[int], target_ts: str) -> TeamMap:
     """
     Most recent CT/TERRORIST -> team names at or before target_ts.
     Prevents team mixing when sides swap.
     """
-    target_dt: datetime = parse_ts(target_ts)
+    hi: int = bisect_right(ts_keys, ts_key(target_ts))
     mapping: TeamMap = {}
 
-    for line in reversed(events):
-        ts = extract_line_ts(line)
-        if ts is None:
+    for i in range(hi - 1, -1, -1):
+        line = events[i]
+        found = match_team_name(line)
+        if found is None:
             continue
 
-        dt = parse_ts(ts)
-        if dt > target_dt:
-            continue
-
-        m = TEAM_NAME_RE.search(line)
-        if not m:
-            continue
-
-        side = Side(m.group("side"))
+        side, name = found
         if side not in mapping:
-            mapping[side] = m.group("name").strip()
+            mapping[side] = name
 
         if Side.CT in mapping and Side.T in mapping:
             break
@@ -146,38 +226,46 @@ def _is_gotv(player_name: str) -> bool:
 
 def roster_from_exact_ts(
     events: list[str],
+    ts_keys: Sequence[int],
     target_ts: str,
     *,
     target_per_side: int = 5,
 ) -> RosterBySide:
     """
     Roster using only action lines at EXACT timestamp (match_start use-case).
+    Stops as soon as both sides have target_per_side players.
     """
-    players: dict[Side, set[str]] = {Side.CT: set(), Side.T: set()}
-
-    for line in events:
-        if extract_line_ts(line) != target_ts:
-            continue
-
-        m = PLAYER_SIDE_RE.match(line)
-        if not m:
+    target_key: int = ts_key(target_ts)
+    lo: int = bisect_left(ts_keys, target_key)
+    hi: int = bisect_right(ts_keys, target_key, lo)
+    # dicts as insertion-ordered sets: dedupe, and a full side stops taking names
+    players: dict[Side, dict[str, None]] = {Side.CT: {}, Side.T: {}}
+
+    for line in events[lo:hi]:
+        found = match_player_side(line)
+        if found is None:
             continue
 
-        player: str = m.group("player").strip()
+        player: str = found[0].strip()
         if _is_gotv(player):
             continue
 
-        side: Side = Side(m.group("side"))
-        players[side].add(player)
+        side: Side = found[1]
+        if len(players[side]) < target_per_side:
+            players[side][player] = None
+
+        if len(players[Side.CT]) >= target_per_side and len(players[Side.T]) >= target_per_side:
+            break
 
     return {
-        side: sorted(names, key=str.lower)[:target_per_side]
+        side: sorted(names, key=str.lower)
         for side, names in players.items()
     }
 
 
 def roster_at_end_backward(
     events: list[str],
+    ts_keys: Sequence[int],
     end_ts: str,
     *,
     target_per_side: int = 5,
@@ -186,34 +274,29 @@ def roster_at_end_backward(
     For end_dt, the exact second often contains too few actions.
     Scan backward within extracted events until we have enough unique players per side.
     """
-    end_dt: datetime = parse_ts(end_ts)
-    players: dict[Side, set[str]] = {Side.CT: set(), Side.T: set()}
-
-    for line in reversed(events):
-        ts = extract_line_ts(line)
-        if ts is None:
-            continue
-
-        dt = parse_ts(ts)
-        if dt > end_dt:
-            continue
-
-        m = PLAYER_SIDE_RE.match(line)
-        if not m:
+    hi: int = bisect_right(ts_keys, ts_key(end_ts))
+    # dicts as insertion-ordered sets: dedupe, and a full side stops taking names
+    players: dict[Side, dict[str, None]] = {Side.CT: {}, Side.T: {}}
+
+    for i in range(hi - 1, -1, -1):
+        line = events[i]
+        found = match_player_side(line)
+        if found is None:
             continue
 
-        player: str = m.group("player").strip()
+        player: str = found[0].strip()
         if _is_gotv(player):
             continue
 
-        side: Side = Side(m.group("side"))
-        players[side].add(player)
+        side: Side = found[1]
+        if len(players[side]) < target_per_side:
+            players[side][player] = None
 
         if len(players[Side.CT]) >= target_per_side and len(players[Side.T]) >= target_per_side:
             break
 
     return {
-        side: sorted(names, key=str.lower)[:target_per_side]
+        side: sorted(names, key=str.lower)
         for side, names in players.items()
     }
 
@@ -246,7 +329,7 @@ def extract_accolades_raw(events: Iterable[str]) -> list[str]:
     """Return accolades as a list of raw, cleaned strings only."""
     out: list[str] = []
     for line in events:
-        if ACCOLADE_MARKER_RE.search(line):
+        if "ACCOLADE" in line and ACCOLADE_MARKER_RE.search(line):
             out.append(normalise_whitespace(line))
     return out
 
@@ -275,14 +358,14 @@ def pretty_print(result: Mapping[str, Any]) -> None:
 def main() -> None:
     start_ts, end_ts = load_frame(KEY_EVENT_PATH)
 
-    events: list[str] = extract_events_in_range(LOG_PATH, start_ts, end_ts)
-    match = MatchData(start_ts=start_ts, end_ts=end_ts, events=events)
+    events, ts_keys = extract_events_in_range(LOG_PATH, start_ts, end_ts)
+    match = MatchData(start_ts=start_ts, end_ts=end_ts, events=events, ts_keys=ts_keys)
 
-    start_team_map: TeamMap = team_names_at_ts(match.events, match.start_ts)
-    end_team_map: TeamMap = team_names_at_ts(match.events, match.end_ts)
+    start_team_map: TeamMap = team_names_at_ts(match.events, match.ts_keys, match.start_ts)
+    end_team_map: TeamMap = team_names_at_ts(match.events, match.ts_keys, match.end_ts)
 
-    start_roster: RosterBySide = roster_from_exact_ts(match.events, match.start_ts, target_per_side=5)
-    end_roster: RosterBySide = roster_at_end_backward(match.events, match.end_ts, target_per_side=5)
+    start_roster: RosterBySide = roster_from_exact_ts(match.events, match.ts_keys, match.start_ts, target_per_side=5)
+    end_roster: RosterBySide = roster_at_end_backward(match.events, match.ts_keys, match.end_ts, target_per_side=5)
 
     accolades: list[str] = extract_accolades_raw(match.events)
 
@@ -293,7 +376,7 @@ def main() -> None:
     }
 
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    OUT_PATH.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    OUT_PATH.write_bytes(json_dumps(result))
 
     pretty_print(result)
 
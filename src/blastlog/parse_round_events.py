@@ -1,42 +1,42 @@
-import json
+import io
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List
 
+from json_io import atomic_write, json_dumps, json_loads
+from log_window import dt_key, ts_prefix_key, window_start_offset
+
 FACEIT_PATH = Path("data/processed/match_faceit_key_events.json")
 LOG_PATH = Path("data/raw/blast-match-data-Nuke.txt")
 OUT_PATH = Path("data/processed/match_round_events.json")
 
 DT_FORMAT = "%m/%d/%Y - %H:%M:%S"
-TS_PREFIX_LEN = len("MM/DD/YYYY - HH:MM:SS")  # 19
-
-
-def parse_line_dt(line: str) -> Optional[datetime]:
-    try:
-        return datetime.strptime(line[:TS_PREFIX_LEN], DT_FORMAT)
-    except Exception:
-        return None
-
+ROUND_TRIGGER = 'World triggered "Round_'
 
-def normalise_line_for_json(line: str) -> str:
-    # Avoid \" in JSON by replacing quotes inside log lines
-    return line.replace('"', "'")
 
-
-def load_match_window(faceit_path: Path) -> tuple[datetime, datetime]:
-    data = json.loads(faceit_path.read_text(encoding="utf-8"))
+def load_match_window(faceit_path: Path) -> tuple[int, int]:
+    data = json_loads(faceit_path.read_bytes())
     return (
-        datetime.strptime(data["start_dt"], DT_FORMAT),
-        datetime.strptime(data["end_dt"], DT_FORMAT),
+        dt_key(datetime.strptime(data["start_dt"], DT_FORMAT)),
+        dt_key(datetime.strptime(data["end_dt"], DT_FORMAT)),
     )
 
 
-def read_lines_in_window(log_path: Path, start_dt: datetime, end_dt: datetime) -> List[str]:
+def read_lines_in_window(log_path: Path, start_key: int, end_key: int) -> List[str]:
     lines: List[str] = []
-    for line in log_path.read_text(encoding="utf-8", errors="replace").splitlines():
-        dt = parse_line_dt(line)
-        if dt is not None and start_dt <= dt <= end_dt:
-            lines.append(line)
+    # Seek straight to the window and stop once past it; only in-window lines are decoded
+    with log_path.open("rb") as raw_f:
+        raw_f.seek(window_start_offset(raw_f, start_key, ts_prefix_key))
+        with io.TextIOWrapper(raw_f, encoding="utf-8", errors="replace") as f:
+            for raw in f:
+                line = raw.rstrip("\n")
+                key = ts_prefix_key(line)
+                if key is None:
+                    continue
+                if key > end_key:
+                    break
+                if key >= start_key:
+                    lines.append(line)
     return lines
 
 
@@ -49,14 +49,23 @@ def group_non_empty_rounds(lines: List[str]) -> Dict[str, List[str]]:
     current_events: List[str] = []
 
     for line in lines:
-        if 'World triggered "Round_Start"' in line:
+        # one find() for the shared prefix, then a short compare to tell Start from End
+        idx = line.find(ROUND_TRIGGER)
+        if idx >= 0:
+            idx += len(ROUND_TRIGGER)
+            is_start = line.startswith('Start"', idx)
+            is_end = not is_start and line.startswith('End"', idx)
+        else:
+            is_start = is_end = False
+
+        if is_start:
             in_round = True
             round_num += 1
             current_key = None
             current_events = []
             continue
 
-        if in_round and 'World triggered "Round_End"' in line:
+        if in_round and is_end:
             if current_events:
                 if current_key is None:
                     current_key = f"round_{round_num}"
@@ -69,25 +78,35 @@ def group_non_empty_rounds(lines: List[str]) -> Dict[str, List[str]]:
         if in_round:
             if current_key is None:
                 current_key = f"round_{round_num}"
-            current_events.append(normalise_line_for_json(line))
+            current_events.append(line)
 
     return rounds
 
 
+def write_round_events(out_path: Path, rounds: Dict[str, List[str]], total_event_lines: int) -> None:
+    # Encode and write one round at a time through a 1 MiB buffer; the bytes match an
+    # indent=2 dump of {"round_count", "total_event_lines", "rounds"} without building it whole.
+    # atomic_write keeps the previous file intact if anything fails part-way.
+    with atomic_write(out_path) as f:
+        f.write(
+            b'{\n  "round_count": ' + str(len(rounds)).encode()
+            + b',\n  "total_event_lines": ' + str(total_event_lines).encode()
+            + b',\n  "rounds": {'
+        )
+        for i, (round_key, events) in enumerate(rounds.items()):
+            f.write(b",\n    " if i else b"\n    ")
+            f.write(json_dumps(round_key) + b": " + json_dumps(events).replace(b"\n", b"\n    "))
+        f.write(b"\n  }\n}" if rounds else b"}\n}")
+
+
 def main() -> None:
-    start_dt, end_dt = load_match_window(FACEIT_PATH)
-    windowed_lines = read_lines_in_window(LOG_PATH, start_dt, end_dt)
+    start_key, end_key = load_match_window(FACEIT_PATH)
+    windowed_lines = read_lines_in_window(LOG_PATH, start_key, end_key)
 
     rounds = group_non_empty_rounds(windowed_lines)
     total_event_lines = sum(len(events) for events in rounds.values())
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "round_count": len(rounds),
-        "total_event_lines": total_event_lines,
-        "rounds": rounds,
-    }
-    OUT_PATH.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_round_events(OUT_PATH, rounds, total_event_lines)
 
     print(f"Wrote {len(rounds)} rounds / {total_event_lines} event lines to {OUT_PATH}")
 
@@ -1,9 +1,11 @@
+import os
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.exceptions import HTTPException
 
 # Serve JSON files from: data/processed/...
 DATA_DIR = Path("data/processed").resolve()
@@ -12,6 +14,36 @@ DATA_DIR = Path("data/processed").resolve()
 # (from the Dockerfile: COPY --from=frontend-build /frontend/dist ./frontend_dist)
 FRONTEND_DIST = Path("frontend_dist").resolve()
 
+
+class RevalidatingStaticFiles(StaticFiles):
+    """
+    StaticFiles already sends an ETag and answers If-None-Match with 304.
+    "no-cache" makes browsers always revalidate, so reloads cost a 304 and
+    re-running the pipeline is never masked by heuristic caching.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+class SPAStaticFiles(StaticFiles):
+    """
+    html=True serves index.html for "/"; unknown extension-less paths also fall
+    back to index.html (client-side routes). Missing files such as a stale
+    /assets/*.js bundle still get a real 404 instead of HTML.
+    """
+
+    async def get_response(self, path, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or os.path.splitext(path)[1]:
+                raise
+            return await super().get_response("index.html", scope)
+
+
 app = FastAPI(title="CS Match Data API")
 
 # Allow your frontend dev server (Vite default)
@@ -28,6 +60,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses (the processed round JSON is hundreds of KB and compresses well)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 @app.get("/health")
 def health():
     return {
@@ -38,23 +73,9 @@ def health():
     }
 
 # Mount static files: /data/... maps to data/processed/...
-app.mount("/data", StaticFiles(directory=str(DATA_DIR)), name="data")
+app.mount("/data", RevalidatingStaticFiles(directory=str(DATA_DIR)), name="data")
 
-# Serve the built frontend (only if it exists, e.g. in Docker/prod)
+# Serve the built frontend (only if it exists, e.g. in Docker/prod).
+# Mounted last so /health and /data take precedence.
 if FRONTEND_DIST.exists():
-    assets_dir = FRONTEND_DIST / "assets"
-    if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="assets")
-
-    @app.get("/")
-    def index():
-        return FileResponse(str(FRONTEND_DIST / "index.html"))
-
-    # SPA fallback: if the path isn't a real file, return index.html
-    # (Needed for React Router / client-side routes)
-    @app.get("/{full_path:path}")
-    def spa_fallback(full_path: str):
-        candidate = FRONTEND_DIST / full_path
-        if candidate.exists() and candidate.is_file():
-            return FileResponse(str(candidate))
-        return FileResponse(str(FRONTEND_DIST / "index.html"))
\ No newline at end of file
+    app.mount("/", SPAStaticFiles(directory=str(FRONTEND_DIST), html=True), name="frontend")